@@ -6,6 +6,8 @@ from pathlib import Path
 from fastapi import FastAPI, Request, Form, status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemLoader
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from utils.logging_config import configure_logging
 from utils.name_checker import check_plausibility
@@ -18,46 +20,85 @@ configure_logging(LOG_FILE)
 logger = logging.getLogger("eurolita")
 
 app = FastAPI()
-templates = Jinja2Templates(directory="templates")
+templates = Jinja2Templates(
+    env=Environment(
+        loader=FileSystemLoader("templates"),
+        autoescape=True,
+        auto_reload=False,  # templates only change on deploy; skip per-render stat()
+        cache_size=400,
+    )
+)
+
+# Compile once at import; handlers only render.
+INDEX_TPL = templates.env.get_template("index.html")
+RESULT_TPL = templates.env.get_template("result.html")
+ERROR_TPL = templates.env.get_template("error.html")
+
+# The landing page has no per-request data; render it once
+INDEX_RENDERED = INDEX_TPL.render(request=None, title="EuroLitA – Satirical Name Checker")
 
 STATS = Counter()
+_stats_get = STATS.get
 
+QUIET_PATHS = frozenset({"/health"})  # not logged by MetricsMiddleware
 
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    start = time.perf_counter()
-    response = None
-    try:
-        response = await call_next(request)
-        return response
-    finally:
-        duration_ms = (time.perf_counter() - start) * 1000
-
-        if request.url.path == "/check" and request.method == "POST":
-            STATS["check_total"] += 1
-
-        logger.info(
-            "path=%s method=%s status=%s duration_ms=%.2f total_checks=%s errors=%s",
-            request.url.path,
-            request.method,
-            getattr(response, "status_code", "unknown"),
-            duration_ms,
-            STATS.get("check_total", 0),
-            STATS.get("check_error", 0),
-        )
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: times each HTTP request without building a Request/Response
+    object or spawning the extra task that BaseHTTPMiddleware needs.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = "unknown"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = scope["path"]
+            method = scope["method"]
+            if path == "/check" and method == "POST":
+                STATS["check_total"] += 1
+
+            # Health probes arrive many times per second; keep them (and disabled INFO) cheap
+            if path not in QUIET_PATHS and logger.isEnabledFor(logging.INFO):
+                duration_ms = (time.perf_counter() - start) * 1000
+                logger.info(
+                    "path=%s method=%s status=%s duration_ms=%.2f total_checks=%s errors=%s",
+                    path,
+                    method,
+                    status_code,
+                    duration_ms,
+                    _stats_get("check_total", 0),
+                    _stats_get("check_error", 0),
+                )
+
+
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "healthy"}
 
 
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request):
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": request, "title": "EuroLitA – Satirical Name Checker"},
-    )
+async def index():
+    return HTMLResponse(INDEX_RENDERED)
 
 
 @app.post("/check", response_class=HTMLResponse)
@@ -72,10 +113,9 @@ async def check(
     except Exception:
         STATS["check_error"] += 1
         logger.exception("check_plausibility failed (country=%s)", country)
-        return templates.TemplateResponse(
-            "error.html",
-            {"request": request, "message": "Temporary error. Please try again."},
+        return HTMLResponse(
+            ERROR_TPL.render(request=request, message="Temporary error. Please try again."),
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         )
 
-    return templates.TemplateResponse("result.html", {"request": request, **result})
\ No newline at end of file
+    return HTMLResponse(RESULT_TPL.render(request=request, **result))
\ No newline at end of file
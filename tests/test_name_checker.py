@@ -1,6 +1,6 @@
 import pytest
 
-from utils.name_checker import check_plausibility
+from utils.name_checker import TOP_N, check_plausibility, check_plausibility_batch, country_names
 
 
 def _pct(x) -> float:
@@ -112,4 +112,54 @@ def test_case_insensitivity():
 
     assert float(result_upper["plausibility_ratio"]) == float(result_lower["plausibility_ratio"])
     assert result_upper["plausibility_label"] == result_lower["plausibility_label"]
-    assert float(result_upper["posterior_share_claimed_pct"]) == float(result_lower["posterior_share_claimed_pct"])
\ No newline at end of file
+    assert float(result_upper["posterior_share_claimed_pct"]) == float(result_lower["posterior_share_claimed_pct"])
+
+
+def test_country_name_case_insensitivity():
+    result_exact = check_plausibility("Anna", "Müller", "Germany")
+    result_mixed = check_plausibility("Anna", "Müller", "  gerMANY ")
+
+    assert result_mixed["claimed_rank"] == result_exact["claimed_rank"]
+    assert float(result_mixed["plausibility_ratio"]) == float(result_exact["plausibility_ratio"])
+    assert result_mixed["country"] == "  gerMANY "
+
+
+def test_repeated_calls_return_independent_results():
+    first = check_plausibility("Anna", "Müller", "Germany")
+    first["ranked_countries"][0]["rank"] = 99
+    first["ranked_countries"].clear()
+    first["plausibility_label"] = "mutated"
+
+    second = check_plausibility("Anna", "Müller", "Germany")
+    assert second["plausibility_label"] != "mutated"
+    assert second["ranked_countries"][0]["rank"] == 1
+
+
+def test_batch_matches_single_calls():
+    names = [
+        ("Anna", "Müller", "Germany"),
+        ("Zofia", "Kowalska", "Poland"),
+        ("Xzqwerty", "Blablablinsky", "Germany"),
+        ("", "Schmidt", "Atlantis"),
+    ]
+    firsts, lasts, countries = zip(*names)
+
+    batch = check_plausibility_batch(firsts, lasts, countries)
+
+    assert batch == [check_plausibility(f, l, c) for f, l, c in names]
+    assert check_plausibility_batch([], [], []) == []
+
+
+def test_claimed_country_listed_at_claimed_rank():
+    # Sparse counts leave many countries tied at zero around the TOP_N cut
+    countries = list(country_names)
+    single = [check_plausibility("Ólafur", "Þórsson", c) for c in countries]
+    batch = check_plausibility_batch(["Ólafur"] * len(countries), ["Þórsson"] * len(countries), countries)
+
+    for result in single + batch:
+        claimed_rows = [row for row in result["ranked_countries"] if row["is_claimed"]]
+        if result["claimed_rank"] <= TOP_N:
+            assert claimed_rows == [result["ranked_countries"][result["claimed_rank"] - 1]]
+            assert claimed_rows[0]["rank"] == result["claimed_rank"]
+        else:
+            assert claimed_rows == []
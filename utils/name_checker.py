@@ -2,10 +2,20 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import sys
+from contextlib import contextmanager
 from functools import lru_cache
+from hashlib import blake2b
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Tuple
 
+try:
+    import fcntl
+except ImportError:  # non-POSIX: no cross-process build lock
+    fcntl = None
+
+import numpy as np
 import polars as pl
 
 from .name_normalizer import EuropeanNameNormalizer
@@ -20,60 +30,113 @@ FORENAMES_PARQUET = CACHE_DIR / "forenames.parquet"
 SURNAMES_PARQUET = CACHE_DIR / "surnames.parquet"
 TOTALS_PARQUET = CACHE_DIR / "totals.parquet"
 GLOBAL_JSON = CACHE_DIR / "global_totals.json"
+CACHE_META = CACHE_DIR / "meta.json"
+CACHE_LOCK = CACHE_DIR / ".build.lock"
 
-# Cache tuples, not DataFrames
-MAX_NAME_CACHE = 12_000          # per-name per-country counts (first OR last)
-MAX_GLOBAL_COUNT_CACHE = 25_000  # global sum for a name
+# Bump when the cache layout changes; any mismatch in meta.json triggers a rebuild.
+CACHE_SCHEMA_VERSION = 4
+# Identifies how the 'h'/'h_ascii' cache columns were computed
+NAME_HASH_SCHEME = "blake2b-64"
 
+SOURCE_CSVS = (
+    DATA_DIR / "forenames_eu.csv",
+    DATA_DIR / "surnames_eu_part1.csv",
+    DATA_DIR / "surnames_eu_part2.csv",
+)
 
 try:
     country_codes_df = pl.read_csv(DATA_DIR / "country_codes.csv")
     country_to_code = dict(zip(country_codes_df["country_name"], country_codes_df["country_code"]))
     code_to_country = {v: k for k, v in country_to_code.items()}
+    # Lowercased names, so "germany" / "GERMANY" resolve without extra work per request
+    country_key_to_code = {sys.intern(k.lower()): v for k, v in country_to_code.items()}
+    del country_codes_df
 except Exception:
     logger.exception("Failed to load country codes CSV from %s", DATA_DIR / "country_codes.csv")
     raise
 
 
 def _safe_country_code(claimed_country: str) -> str:
+    # Common case: the exact country name from the form
+    code = country_to_code.get(claimed_country)
+    if code is not None:
+        return code
     claimed_country = (claimed_country or "").strip()
-    if claimed_country in country_to_code:
-        return country_to_code[claimed_country]
-    cc = claimed_country.upper()
-    return cc if len(cc) == 2 else cc[:2]
+    code = country_key_to_code.get(claimed_country.lower())
+    return code if code is not None else claimed_country[:2].upper()
 
 
-def _parquet_has_hash_columns(path: Path) -> bool:
+def _expected_cache_meta() -> Dict[str, Any]:
     """
-    We require both primary + ascii keys (and their hashes) in the cache schema.
+    What meta.json must contain for the cache to be current: layout version + source file stats.
     """
-    if not path.exists():
+    meta: Dict[str, Any] = {"schema_version": CACHE_SCHEMA_VERSION, "name_hash": NAME_HASH_SCHEME}
+    for path in SOURCE_CSVS:
+        st = path.stat()
+        meta[path.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return meta
+
+
+def _cache_is_current(expected: Dict[str, Any]) -> bool:
+    cache_files = [FORENAMES_PARQUET, SURNAMES_PARQUET, TOTALS_PARQUET, GLOBAL_JSON, *INDEX_FILES]
+    if not all(p.exists() for p in cache_files):
         return False
     try:
-        cols = pl.scan_parquet(path).collect_schema().names()
-        required = {"country", "count", "name", "h", "name_ascii", "h_ascii"}
-        return required.issubset(set(cols))
+        return json.loads(CACHE_META.read_text(encoding="utf-8")) == expected
+    except FileNotFoundError:
+        return False
     except Exception:
-        logger.warning("Failed to inspect parquet schema for %s", path, exc_info=True)
+        logger.warning("Failed to read cache metadata from %s", CACHE_META, exc_info=True)
         return False
 
 
+@contextmanager
+def _cache_build_lock() -> Iterator[None]:
+    """
+    Serialize cache builds across worker processes.
+    """
+    with open(CACHE_LOCK, "w") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _replace_atomically(path: Path) -> Iterator[Path]:
+    """
+    Yield a temp path next to `path` and move it into place once written.
+    Running workers keep their mmap of the old file instead of seeing a truncated one.
+    """
+    tmp = path.with_name(f".{path.stem}.tmp{path.suffix}")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 def _name_hash_u64(name: str) -> int:
-    # must match Parquet 'h' computation
-    return int(pl.Series([name]).hash()[0])
+    # must match Parquet 'h' computation; plain Python, stable across processes and Polars versions
+    return int.from_bytes(blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
 
 
-def _normalize_unique_names(df: pl.DataFrame, raw_col: str, *, de_transliteration: bool) -> pl.DataFrame:
+def _normalize_unique_names(lf: pl.LazyFrame, raw_col: str, *, de_transliteration: bool) -> pl.DataFrame:
     """
-    Build a mapping DataFrame: raw -> name (primary) + name_ascii (fallback)
+    Build a mapping DataFrame: raw -> name (primary) + name_ascii (fallback), plus their hashes.
     Normalizes only unique raw strings to keep work bounded.
     """
     norm = EuropeanNameNormalizer(keep_apostrophe=False, de_transliteration=de_transliteration)
-    uniq = df.select(pl.col(raw_col).unique()).get_column(raw_col).to_list()
+    uniq = lf.select(pl.col(raw_col).unique()).collect(engine="streaming").get_column(raw_col).to_list()
 
     raw_vals: List[str] = []
     prim_vals: List[str] = []
     ascii_vals: List[str] = []
+    h_vals: List[int] = []
+    h_ascii_vals: List[int] = []
 
     for x in uniq:
         x_str = "" if x is None else str(x)
@@ -84,8 +147,92 @@ def _normalize_unique_names(df: pl.DataFrame, raw_col: str, *, de_transliteratio
         raw_vals.append(x_str)
         prim_vals.append(primary)
         ascii_vals.append(ascii_)
+        h_vals.append(_name_hash_u64(primary))
+        h_ascii_vals.append(_name_hash_u64(ascii_))
 
-    return pl.DataFrame({raw_col: raw_vals, "name": prim_vals, "name_ascii": ascii_vals})
+    return pl.DataFrame(
+        {raw_col: raw_vals, "name": prim_vals, "h": h_vals, "name_ascii": ascii_vals, "h_ascii": h_ascii_vals},
+        schema={raw_col: pl.Utf8, "name": pl.Utf8, "h": pl.UInt64, "name_ascii": pl.Utf8, "h_ascii": pl.UInt64},
+    )
+
+
+class _NameIndex(NamedTuple):
+    """
+    CSR-style name index: rows for keys[i] live in offsets[i]:offsets[i + 1].
+    Saved as .npy next to the Parquet caches and memory-mapped at import.
+    """
+    keys: np.ndarray      # sorted name hashes (uint64)
+    offsets: np.ndarray   # len(keys) + 1
+    countries: np.ndarray  # int16 index into the totals country order (or its length for "other")
+    counts: np.ndarray     # uint32
+
+
+def _index_path(parquet_path: Path, hash_col: str, field: str) -> Path:
+    return CACHE_DIR / f"{parquet_path.stem}.{hash_col}.{field}.npy"
+
+
+INDEX_FILES = [
+    _index_path(parquet_path, hash_col, field)
+    for parquet_path in (FORENAMES_PARQUET, SURNAMES_PARQUET)
+    for hash_col in ("h", "h_ascii")
+    for field in _NameIndex._fields
+]
+
+
+def _write_name_index(parquet_path: Path, hash_col: str, countries: List[str]) -> None:
+    """
+    Group a name cache by one hash column into CSR arrays and save them as .npy.
+    Rows of countries not in `countries` go to the extra slot len(countries).
+    """
+    rows = (
+        pl.read_parquet(parquet_path, columns=[hash_col, "country", "count"])
+        .drop_nulls(hash_col)
+        .with_columns(
+            pl.col("country").replace_strict(
+                countries, list(range(len(countries))), default=len(countries), return_dtype=pl.Int16
+            )
+        )
+    )
+    keys = rows[hash_col].to_numpy()
+    idx = rows["country"].to_numpy()
+    cnt = rows["count"].to_numpy()
+    del rows
+
+    order = np.lexsort((idx, keys))
+    keys, idx, cnt = keys[order], idx[order], cnt[order]
+    del order
+
+    # Several names can share an ascii key within one country: merge those rows
+    new_row = np.ones(len(keys), dtype=bool)
+    new_row[1:] = (keys[1:] != keys[:-1]) | (idx[1:] != idx[:-1])
+    row_starts = np.flatnonzero(new_row)
+    cnt = np.add.reduceat(cnt.astype(np.int64), row_starts).astype(np.uint32)
+    keys, idx = keys[row_starts], idx[row_starts]
+
+    new_key = np.ones(len(keys), dtype=bool)
+    new_key[1:] = keys[1:] != keys[:-1]
+    key_starts = np.flatnonzero(new_key)
+
+    index = _NameIndex(
+        keys=keys[key_starts],
+        offsets=np.append(key_starts, len(keys)).astype(np.int64),
+        countries=idx,
+        counts=cnt,
+    )
+    for field, arr in zip(_NameIndex._fields, index):
+        with _replace_atomically(_index_path(parquet_path, hash_col, field)) as tmp:
+            np.save(tmp, arr)
+
+
+def _load_name_index(parquet_path: Path, hash_col: str) -> _NameIndex:
+    # mmap: pages load on first touch and are shared between worker processes.
+    # Plain ndarray views skip np.memmap's per-slice subclass overhead.
+    return _NameIndex(
+        *(
+            np.load(_index_path(parquet_path, hash_col, field), mmap_mode="r").view(np.ndarray)
+            for field in _NameIndex._fields
+        )
+    )
 
 
 # The goal was to fit into 512 MB RAM :)
@@ -96,24 +243,38 @@ def _build_cache_if_missing() -> None:
     Cache schema (both forenames/surnames):
       - country: Utf8
       - name: primary normalized key
-      - h: hash(name)
+      - h: _name_hash_u64(name)
       - name_ascii: ascii fallback normalized key
-      - h_ascii: hash(name_ascii)
-      - count: Int64
+      - h_ascii: _name_hash_u64(name_ascii)
+      - count: UInt32 (per country+name; totals stay Int64)
+
+    Plus a _NameIndex per (cache, hash column) saved as .npy arrays.
 
     Also computes vocabulary sizes needed for additive smoothing (based on primary key).
+    The cache is considered current when meta.json matches _expected_cache_meta().
     """
-    caches_exist = (
-        FORENAMES_PARQUET.exists()
-        and SURNAMES_PARQUET.exists()
-        and TOTALS_PARQUET.exists()
-        and GLOBAL_JSON.exists()
-    )
-    caches_ok = caches_exist and _parquet_has_hash_columns(FORENAMES_PARQUET) and _parquet_has_hash_columns(SURNAMES_PARQUET)
-    if caches_ok:
+    try:
+        expected_meta = _expected_cache_meta()
+    except Exception:
+        logger.exception("Failed to stat source CSVs in %s", DATA_DIR)
+        raise
+
+    if _cache_is_current(expected_meta):
         logger.info("Cache OK: using existing parquet files in %s", CACHE_DIR)
         return
 
+    with _cache_build_lock():
+        # Another worker may have finished the build while we waited for the lock
+        if _cache_is_current(expected_meta):
+            logger.info("Cache OK: built by another process in %s", CACHE_DIR)
+            return
+        CACHE_META.unlink(missing_ok=True)
+        _build_cache()
+        # Written last: an interrupted build is never mistaken for a current cache
+        CACHE_META.write_text(json.dumps(expected_meta), encoding="utf-8")
+
+
+def _build_cache() -> None:
     logger.info("Building Parquet cache (one-time). DATA_DIR=%s CACHE_DIR=%s", DATA_DIR, CACHE_DIR)
 
     try:
@@ -124,25 +285,23 @@ def _build_cache_if_missing() -> None:
                 pl.col("forename").cast(pl.Utf8).alias("raw"),
                 pl.col("count").fill_null(0).cast(pl.Int64),
             )
-            .collect(streaming=True)
         )
 
         # Important: we do NOT apply de_transliteration for the *whole* cache,
         # because the cache covers many countries; DE transliteration is applied at query time.
         forename_map = _normalize_unique_names(raw_forenames, "raw", de_transliteration=False)
 
-        forenames = (
-            raw_forenames
-            .join(forename_map, on="raw", how="left")
-            .drop("raw")
-            .with_columns(
-                pl.col("name").hash().alias("h"),
-                pl.col("name_ascii").hash().alias("h_ascii"),
+        # Streamed straight to disk: the grouped table is never held in memory
+        with _replace_atomically(FORENAMES_PARQUET) as tmp:
+            (
+                raw_forenames
+                .join(forename_map.lazy(), on="raw", how="left")
+                .drop("raw")
+                .group_by(["country", "name", "h", "name_ascii", "h_ascii"])
+                .agg(pl.col("count").sum().cast(pl.UInt32).alias("count"))
+                .sink_parquet(tmp, engine="streaming")
             )
-            .group_by(["country", "name", "h", "name_ascii", "h_ascii"])
-            .agg(pl.col("count").sum().alias("count"))
-        )
-        forenames.write_parquet(FORENAMES_PARQUET)
+        del forename_map
 
         raw_surnames = (
             pl.concat(
@@ -157,43 +316,63 @@ def _build_cache_if_missing() -> None:
                 pl.col("surname").cast(pl.Utf8).alias("raw"),
                 pl.col("count").fill_null(0).cast(pl.Int64),
             )
-            .collect(streaming=True)
         )
 
         surname_map = _normalize_unique_names(raw_surnames, "raw", de_transliteration=False)
 
-        surnames = (
-            raw_surnames
-            .join(surname_map, on="raw", how="left")
-            .drop("raw")
-            .with_columns(
-                pl.col("name").hash().alias("h"),
-                pl.col("name_ascii").hash().alias("h_ascii"),
+        with _replace_atomically(SURNAMES_PARQUET) as tmp:
+            (
+                raw_surnames
+                .join(surname_map.lazy(), on="raw", how="left")
+                .drop("raw")
+                .group_by(["country", "name", "h", "name_ascii", "h_ascii"])
+                .agg(pl.col("count").sum().cast(pl.UInt32).alias("count"))
+                .sink_parquet(tmp, engine="streaming")
             )
-            .group_by(["country", "name", "h", "name_ascii", "h_ascii"])
-            .agg(pl.col("count").sum().alias("count"))
-        )
-        surnames.write_parquet(SURNAMES_PARQUET)
+        del surname_map
+
+        # Derived tables are small; compute them from the just-written caches
+        forenames = pl.scan_parquet(FORENAMES_PARQUET)
+        surnames = pl.scan_parquet(SURNAMES_PARQUET)
 
-        forename_totals = forenames.group_by("country").agg(pl.col("count").sum().alias("total_forenames"))
-        surname_totals = surnames.group_by("country").agg(pl.col("count").sum().alias("total_surnames"))
-        totals = (
-            forename_totals.join(surname_totals, on="country", how="inner")
-            .select("country", "total_forenames", "total_surnames")
+        forename_totals = forenames.group_by("country").agg(
+            pl.col("count").cast(pl.Int64).sum().alias("total_forenames")
+        )
+        surname_totals = surnames.group_by("country").agg(
+            pl.col("count").cast(pl.Int64).sum().alias("total_surnames")
         )
-        totals.write_parquet(TOTALS_PARQUET)
+        with _replace_atomically(TOTALS_PARQUET) as tmp:
+            (
+                forename_totals.join(surname_totals, on="country", how="inner")
+                .select("country", "total_forenames", "total_surnames")
+                .sort("country")  # stable country order -> deterministic ranking on ties
+                .sink_parquet(tmp, engine="streaming")
+            )
 
         # Use PRIMARY key vocab sizes (keeps your model sharper)
-        v_forenames = int(forenames.select(pl.col("name").n_unique()).item())
-        v_surnames = int(surnames.select(pl.col("name").n_unique()).item())
+        f_stats = forenames.select(
+            pl.col("count").cast(pl.Int64).sum().alias("total"),
+            pl.col("name").n_unique().alias("vocab"),
+        ).collect(engine="streaming")
+        s_stats = surnames.select(
+            pl.col("count").cast(pl.Int64).sum().alias("total"),
+            pl.col("name").n_unique().alias("vocab"),
+        ).collect(engine="streaming")
 
         global_totals = {
-            "GLOBAL_FORENAME_TOTAL": int(forenames["count"].sum()),
-            "GLOBAL_SURNAME_TOTAL": int(surnames["count"].sum()),
-            "V_FORENAMES": v_forenames,
-            "V_SURNAMES": v_surnames,
+            "GLOBAL_FORENAME_TOTAL": int(f_stats["total"][0]),
+            "GLOBAL_SURNAME_TOTAL": int(s_stats["total"][0]),
+            "V_FORENAMES": int(f_stats["vocab"][0]),
+            "V_SURNAMES": int(s_stats["vocab"][0]),
         }
-        GLOBAL_JSON.write_text(json.dumps(global_totals), encoding="utf-8")
+        with _replace_atomically(GLOBAL_JSON) as tmp:
+            tmp.write_text(json.dumps(global_totals), encoding="utf-8")
+
+        # Request-time lookup structures, aligned with the totals country order
+        countries = pl.read_parquet(TOTALS_PARQUET)["country"].to_list()
+        for parquet_path in (FORENAMES_PARQUET, SURNAMES_PARQUET):
+            for hash_col in ("h", "h_ascii"):
+                _write_name_index(parquet_path, hash_col, countries)
 
         logger.info(
             "Cache built: forenames=%s surnames=%s totals=%s global=%s",
@@ -212,9 +391,6 @@ def _build_cache_if_missing() -> None:
 _build_cache_if_missing()
 
 try:
-    # Lazy scans (cheap, low RAM)
-    forenames_lf = pl.scan_parquet(FORENAMES_PARQUET)
-    surnames_lf = pl.scan_parquet(SURNAMES_PARQUET)
     countries_df = pl.read_parquet(TOTALS_PARQUET)  # small; OK to load
 except Exception:
     logger.exception("Failed to load parquet cache files from %s", CACHE_DIR)
@@ -231,172 +407,103 @@ except Exception:
     raise
 
 
-@lru_cache(maxsize=MAX_NAME_CACHE)
-def _forename_counts_tuples2(name: str, name_ascii: str) -> Tuple[Tuple[str, int], ...]:
-    if not name and not name_ascii:
-        return tuple()
-    try:
-        frames: List[pl.LazyFrame] = []
-
-        if name:
-            h = _name_hash_u64(name)
-            frames.append(
-                forenames_lf
-                .filter(pl.col("h") == h)
-                .filter(pl.col("name") == name)  # collision guard
-                .select("country", "count")
-            )
-
-        if name_ascii and name_ascii != name:
-            h_ascii = _name_hash_u64(name_ascii)
-            frames.append(
-                forenames_lf
-                .filter(pl.col("h_ascii") == h_ascii)
-                .filter(pl.col("name_ascii") == name_ascii)  # collision guard
-                .select("country", "count")
-            )
-
-        if not frames:
-            return tuple()
-
-        df = pl.concat([f.collect() for f in frames], how="vertical_relaxed")
-        if df.is_empty():
-            return tuple()
-
-        df = df.group_by("country").agg(pl.col("count").sum().alias("count"))
-        return tuple((str(c), int(cnt)) for c, cnt in df.iter_rows())
-    except Exception:
-        logger.exception("Forename lookup failed")
-        return tuple()
-
-
-@lru_cache(maxsize=MAX_NAME_CACHE)
-def _surname_counts_tuples2(name: str, name_ascii: str) -> Tuple[Tuple[str, int], ...]:
-    if not name and not name_ascii:
-        return tuple()
-    try:
-        frames: List[pl.LazyFrame] = []
-
-        if name:
-            h = _name_hash_u64(name)
-            frames.append(
-                surnames_lf
-                .filter(pl.col("h") == h)
-                .filter(pl.col("name") == name)  # collision guard
-                .select("country", "count")
-            )
+# Fixed country order shared by every per-country vector below.
+# Rows for countries outside countries_df land in the extra "sink" slot N_COUNTRIES:
+# they still count towards global totals but never get ranked.
+countries_list: List[str] = countries_df["country"].to_list()
+N_COUNTRIES = len(countries_list)
+country_idx: Dict[str, int] = {c: i for i, c in enumerate(countries_list)}
+# Display names aligned with countries_list (the code itself if the CSV has no name for it)
+country_names: Tuple[str, ...] = tuple(code_to_country.get(c, c) for c in countries_list)
+total_forenames = countries_df["total_forenames"].to_numpy()
+total_surnames = countries_df["total_surnames"].to_numpy()
+# Only the extracted lists/arrays are used from here on
+del countries_df, _global
+
+# Additive smoothing; denominators are constant per country, so compute them once.
+ALPHA = 0.5
+DENOM_F = total_forenames.astype(np.float64) + ALPHA * V_FORENAMES
+DENOM_S = total_surnames.astype(np.float64) + ALPHA * V_SURNAMES
+GLOBAL_DENOM_F = GLOBAL_FORENAME_TOTAL + ALPHA * V_FORENAMES
+GLOBAL_DENOM_S = GLOBAL_SURNAME_TOTAL + ALPHA * V_SURNAMES
+# Multiplying by the reciprocal is cheaper than dividing per country
+INV_DENOM_F = 1.0 / DENOM_F
+INV_DENOM_S = 1.0 / DENOM_S
+
+TOP_N = 8  # countries listed in the result
+
+# Label i applies to ratios in [THRESHOLDS[i - 1], THRESHOLDS[i])
+PLAUSIBILITY_THRESHOLDS = (0.3, 0.7, 1.5, 3.0)
+PLAUSIBILITY_LABELS = ("Very unusual", "Unusual", "Neutral", "Typical", "Very typical")
+MAX_RESULT_CACHE = 4_096  # full results keyed on normalized (first, last, country code)
 
-        if name_ascii and name_ascii != name:
-            h_ascii = _name_hash_u64(name_ascii)
-            frames.append(
-                surnames_lf
-                .filter(pl.col("h_ascii") == h_ascii)
-                .filter(pl.col("name_ascii") == name_ascii)  # collision guard
-                .select("country", "count")
-            )
 
-        if not frames:
-            return tuple()
+try:
+    forename_index = _load_name_index(FORENAMES_PARQUET, "h")
+    forename_ascii_index = _load_name_index(FORENAMES_PARQUET, "h_ascii")
+    surname_index = _load_name_index(SURNAMES_PARQUET, "h")
+    surname_ascii_index = _load_name_index(SURNAMES_PARQUET, "h_ascii")
+except Exception:
+    logger.exception("Failed to load name index from %s", CACHE_DIR)
+    raise
 
-        df = pl.concat([f.collect() for f in frames], how="vertical_relaxed")
-        if df.is_empty():
-            return tuple()
 
-        df = df.group_by("country").agg(pl.col("count").sum().alias("count"))
-        return tuple((str(c), int(cnt)) for c, cnt in df.iter_rows())
-    except Exception:
-        logger.exception("Surname lookup failed")
-        return tuple()
+def _lookup(index: _NameIndex, name: str) -> Tuple[np.ndarray, np.ndarray]:
+    h = _name_hash_u64(name)
+    # np.uint64 key: a plain Python int above int64 range makes searchsorted fall back to a slow path
+    i = int(index.keys.searchsorted(np.uint64(h)))
+    if i == len(index.keys) or int(index.keys[i]) != h:
+        return index.countries[:0], index.counts[:0]
+    start, stop = index.offsets[i], index.offsets[i + 1]
+    return index.countries[start:stop], index.counts[start:stop]
 
 
-@lru_cache(maxsize=MAX_GLOBAL_COUNT_CACHE)
-def _global_forename_count2(name: str, name_ascii: str) -> int:
-    if not name and not name_ascii:
-        return 0
-    try:
-        total = 0
-
-        if name:
-            h = _name_hash_u64(name)
-            val = (
-                forenames_lf
-                .filter(pl.col("h") == h)
-                .filter(pl.col("name") == name)
-                .select(pl.col("count").sum())
-                .collect()[0, 0]
-            )
-            total += int(val or 0)
-
-        if name_ascii and name_ascii != name:
-            h_ascii = _name_hash_u64(name_ascii)
-            val2 = (
-                forenames_lf
-                .filter(pl.col("h_ascii") == h_ascii)
-                .filter(pl.col("name_ascii") == name_ascii)
-                .select(pl.col("count").sum())
-                .collect()[0, 0]
-            )
-            total += int(val2 or 0)
+def _add_name_counts(out: np.ndarray, primary: _NameIndex, ascii_: _NameIndex, name: str, name_ascii: str) -> None:
+    """
+    Add per-country counts for a name (primary key + ascii fallback) into a length N_COUNTRIES + 1 row.
+    """
+    if name:
+        idx, cnt = _lookup(primary, name)
+        out[idx] += cnt
+    if name_ascii and name_ascii != name:
+        idx, cnt = _lookup(ascii_, name_ascii)
+        out[idx] += cnt
 
-        return total
-    except Exception:
-        logger.exception("Global forename count failed")
-        return 0
 
+def _joint(f_cnt: np.ndarray, l_cnt: np.ndarray) -> np.ndarray:
+    """
+    Smoothed p_first * p_last per country, 0 where neither name occurs.
+    In-place ops: two float buffers instead of one temporary per arithmetic step.
+    """
+    joint = np.add(f_cnt, ALPHA, dtype=np.float64)
+    joint *= INV_DENOM_F
+    p_last = np.add(l_cnt, ALPHA, dtype=np.float64)
+    p_last *= INV_DENOM_S
+    joint *= p_last
+    joint[(f_cnt == 0) & (l_cnt == 0)] = 0.0
+    return joint
 
-@lru_cache(maxsize=MAX_GLOBAL_COUNT_CACHE)
-def _global_surname_count2(name: str, name_ascii: str) -> int:
-    if not name and not name_ascii:
-        return 0
-    try:
-        total = 0
-
-        if name:
-            h = _name_hash_u64(name)
-            val = (
-                surnames_lf
-                .filter(pl.col("h") == h)
-                .filter(pl.col("name") == name)
-                .select(pl.col("count").sum())
-                .collect()[0, 0]
-            )
-            total += int(val or 0)
-
-        if name_ascii and name_ascii != name:
-            h_ascii = _name_hash_u64(name_ascii)
-            val2 = (
-                surnames_lf
-                .filter(pl.col("h_ascii") == h_ascii)
-                .filter(pl.col("name_ascii") == name_ascii)
-                .select(pl.col("count").sum())
-                .collect()[0, 0]
-            )
-            total += int(val2 or 0)
 
-        return total
-    except Exception:
-        logger.exception("Global surname count failed")
-        return 0
+def _top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Per row, indices of the k largest values, largest first (ties broken by position).
+    A full stable sort: ~35 countries, and argpartition would pick arbitrary members of a tie at the cut.
+    """
+    return np.argsort(-values, axis=1, kind="stable")[:, :k]
 
 
-def _tuples_to_df(tuples_: Tuple[Tuple[str, int], ...], col_name: str) -> pl.DataFrame:
-    if not tuples_:
-        return pl.DataFrame({"country": [], col_name: []}, schema={"country": pl.Utf8, col_name: pl.Int64})
-    countries, counts = zip(*tuples_)
-    return pl.DataFrame({"country": list(countries), col_name: list(counts)})
+# Normalizers are stateless; build them once instead of per request
+DE_TRANSLITERATION_CODES = frozenset({"DE", "AT", "CH"})
+_NORMALIZER = EuropeanNameNormalizer(keep_apostrophe=False, de_transliteration=False)
+_DE_NORMALIZER = EuropeanNameNormalizer(keep_apostrophe=False, de_transliteration=True)
 
 
-def check_plausibility(first: str, last: str, claimed_country: str) -> Dict[str, Any]:
+def _lookup_keys(first: str, last: str, code: str) -> Tuple[str, str, str, str]:
     """
-    Evaluate how plausible a first+last name pairing is for a claimed country.
+    (first_primary, first_ascii, last_primary, last_ascii) for a query.
     """
-    code = _safe_country_code(claimed_country)
-
     # German transliteration only for DE/AT/CH (query-time only)
-    normalizer = EuropeanNameNormalizer(
-        keep_apostrophe=False,
-        de_transliteration=(code in {"DE", "AT", "CH"}),
-    )
+    normalizer = _DE_NORMALIZER if code in DE_TRANSLITERATION_CODES else _NORMALIZER
 
     first_vars = normalizer.variants(first or "")
     last_vars = normalizer.variants(last or "")
@@ -407,94 +514,141 @@ def check_plausibility(first: str, last: str, claimed_country: str) -> Dict[str,
     last_primary = last_vars[0] if last_vars else ""
     last_ascii = last_vars[1] if len(last_vars) > 1 else last_primary
 
-    alpha = 0.5
+    return first_primary, first_ascii, last_primary, last_ascii
 
-    try:
-        f_tuples = _forename_counts_tuples2(first_primary, first_ascii)
-        l_tuples = _surname_counts_tuples2(last_primary, last_ascii)
-
-        f_counts = _tuples_to_df(f_tuples, "f_cnt")
-        l_counts = _tuples_to_df(l_tuples, "l_cnt")
-
-        per_country = (
-            countries_df
-            .join(f_counts, on="country", how="left")
-            .join(l_counts, on="country", how="left")
-            .with_columns(
-                pl.col("f_cnt").fill_null(0),
-                pl.col("l_cnt").fill_null(0),
-            )
-            .with_columns(
-                ((pl.col("f_cnt") + alpha) / (pl.col("total_forenames") + alpha * V_FORENAMES)).alias("p_first"),
-                ((pl.col("l_cnt") + alpha) / (pl.col("total_surnames") + alpha * V_SURNAMES)).alias("p_last"),
-            )
-            .with_columns((pl.col("p_first") * pl.col("p_last")).alias("joint_raw"))
-            .with_columns(
-                pl.when((pl.col("f_cnt") == 0) & (pl.col("l_cnt") == 0))
-                .then(0.0)
-                .otherwise(pl.col("joint_raw"))
-                .alias("joint")
-            )
-            .select("country", "joint", "f_cnt", "l_cnt")
-            .sort("joint", descending=True)
+
+def _score_rows(keys: Sequence[Tuple[str, str, str, str]], codes: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Score B queries at once: all per-country math runs on (B, N_COUNTRIES) arrays.
+    Results omit "country" (the caller's raw input).
+    """
+    n_rows = len(keys)
+    f_all = np.zeros((n_rows, N_COUNTRIES + 1), dtype=np.int64)
+    l_all = np.zeros((n_rows, N_COUNTRIES + 1), dtype=np.int64)
+    for f_row, l_row, (first_primary, first_ascii, last_primary, last_ascii) in zip(f_all, l_all, keys):
+        _add_name_counts(f_row, forename_index, forename_ascii_index, first_primary, first_ascii)
+        _add_name_counts(l_row, surname_index, surname_ascii_index, last_primary, last_ascii)
+    f_cnt = f_all[:, :N_COUNTRIES]
+    l_cnt = l_all[:, :N_COUNTRIES]
+
+    joint = _joint(f_cnt, l_cnt)
+
+    joint_sum = joint.sum(axis=1)
+    joint_sum[joint_sum == 0] = 1.0
+
+    p_first_global = (f_all.sum(axis=1) + ALPHA) / GLOBAL_DENOM_F
+    p_last_global = (l_all.sum(axis=1) + ALPHA) / GLOBAL_DENOM_S
+    p_global_joint = p_first_global * p_last_global
+
+    claimed = np.array([country_idx.get(code, -1) for code in codes], dtype=np.int64).reshape(n_rows)
+    has_claim = claimed >= 0
+    rows = np.arange(n_rows)
+    claimed_joint = np.where(has_claim, joint[rows, claimed], 0.0)
+    # Shares only where reported (claimed + top-k), not for every country
+    posterior_share_claimed = np.where(has_claim, claimed_joint / joint_sum, 0.0)
+
+    plausibility_ratio = np.divide(
+        claimed_joint, p_global_joint, out=np.zeros(n_rows), where=p_global_joint > 0
+    )
+    label_idx = np.searchsorted(PLAUSIBILITY_THRESHOLDS, plausibility_ratio, side="right")
+
+    # Position in the stable descending order: strictly better countries + earlier ties
+    ties_before = (joint == claimed_joint[:, None]) & (np.arange(N_COUNTRIES) < claimed[:, None])
+    claimed_rank = (joint > claimed_joint[:, None]).sum(axis=1) + ties_before.sum(axis=1) + 1
+
+    top = _top_k(joint, TOP_N)
+
+    # Plain Python values up front: per-element numpy scalar access is slow in the emit loop
+    top_share = (np.take_along_axis(joint, top, axis=1) / joint_sum[:, None]).tolist()
+    top_f = np.take_along_axis(f_cnt, top, axis=1).tolist()
+    top_l = np.take_along_axis(l_cnt, top, axis=1).tolist()
+
+    results: List[Dict[str, Any]] = []
+    for code, ratio, label, share_claimed, rank, claim_known, top_r, share_r, f_r, l_r in zip(
+        codes,
+        plausibility_ratio.tolist(),
+        label_idx.tolist(),
+        posterior_share_claimed.tolist(),
+        claimed_rank.tolist(),
+        has_claim.tolist(),
+        top.tolist(),
+        top_share,
+        top_f,
+        top_l,
+    ):
+        results.append(
+            {
+                "plausibility_ratio": round(ratio, 3),
+                "plausibility_label": PLAUSIBILITY_LABELS[label],
+                "posterior_share_claimed_pct": round(100 * share_claimed, 2),
+                "claimed_rank": rank if claim_known else "unknown",
+                "top_country": country_names[top_r[0]],
+                "ranked_countries": [
+                    {
+                        "rank": i,
+                        "country": country_names[k],
+                        "posterior_share_pct": round(100 * share, 2),
+                        "first_count": f,
+                        "last_count": l,
+                        "is_claimed": countries_list[k] == code,
+                    }
+                    for i, (k, share, f, l) in enumerate(zip(top_r, share_r, f_r, l_r), start=1)
+                ],
+            }
         )
+    return results
 
-        joint_sum = float(per_country["joint"].sum()) or 1.0
-        per_country = per_country.with_columns((pl.col("joint") / joint_sum).alias("posterior_share"))
-
-        global_first_count = _global_forename_count2(first_primary, first_ascii)
-        global_last_count = _global_surname_count2(last_primary, last_ascii)
-
-        p_first_global = (global_first_count + alpha) / (GLOBAL_FORENAME_TOTAL + alpha * V_FORENAMES)
-        p_last_global = (global_last_count + alpha) / (GLOBAL_SURNAME_TOTAL + alpha * V_SURNAMES)
-        p_global_joint = p_first_global * p_last_global
-
-        claimed_row = per_country.filter(pl.col("country") == code)
-        claimed_joint = float(claimed_row["joint"][0]) if claimed_row.height else 0.0
-        posterior_share_claimed = float(claimed_row["posterior_share"][0]) if claimed_row.height else 0.0
-
-        plausibility_ratio = (claimed_joint / p_global_joint) if p_global_joint > 0 else 0.0
-
-        if plausibility_ratio < 0.3:
-            plaus_label = "Very unusual"
-        elif plausibility_ratio < 0.7:
-            plaus_label = "Unusual"
-        elif plausibility_ratio < 1.5:
-            plaus_label = "Neutral"
-        elif plausibility_ratio < 3.0:
-            plaus_label = "Typical"
-        else:
-            plaus_label = "Very typical"
-
-        countries_sorted = per_country["country"].to_list()
-        claimed_rank = countries_sorted.index(code) + 1 if code in countries_sorted else "unknown"
-
-        top_country_code = per_country["country"][0]
-        top_country = code_to_country.get(top_country_code, top_country_code)
-
-        ranked_countries: List[Dict[str, Any]] = []
-        for i, row in enumerate(per_country.head(8).iter_rows(named=True), start=1):
-            ranked_countries.append(
-                {
-                    "rank": i,
-                    "country": code_to_country.get(row["country"], row["country"]),
-                    "posterior_share_pct": round(100 * float(row["posterior_share"]), 2),
-                    "first_count": int(row["f_cnt"]),
-                    "last_count": int(row["l_cnt"]),
-                    "is_claimed": (row["country"] == code),
-                }
-            )
 
-        return {
-            "country": claimed_country,
-            "plausibility_ratio": round(plausibility_ratio, 3),
-            "plausibility_label": plaus_label,
-            "posterior_share_claimed_pct": round(100 * posterior_share_claimed, 2),
-            "claimed_rank": claimed_rank,
-            "top_country": top_country,
-            "ranked_countries": ranked_countries,
-        }
+@lru_cache(maxsize=MAX_RESULT_CACHE)
+def _score(first_primary: str, first_ascii: str, last_primary: str, last_ascii: str, code: str) -> Dict[str, Any]:
+    """
+    Deterministic scoring on normalized keys. Cached: callers must not mutate the result.
+    """
+    (result,) = _score_rows([(first_primary, first_ascii, last_primary, last_ascii)], [code])
+    result["ranked_countries"] = tuple(result["ranked_countries"])
+    return result
+
+
+def check_plausibility(first: str, last: str, claimed_country: str) -> Dict[str, Any]:
+    """
+    Evaluate how plausible a first+last name pairing is for a claimed country.
+    """
+    code = _safe_country_code(claimed_country)
 
+    try:
+        scored = _score(*_lookup_keys(first, last, code), code)
     except Exception:
         logger.exception("check_plausibility failed (claimed_country=%r)", claimed_country)
-        raise
\ No newline at end of file
+        raise
+
+    # Fresh containers per call: the cached result is shared between requests
+    return {
+        "country": claimed_country,
+        **scored,
+        "ranked_countries": [dict(row) for row in scored["ranked_countries"]],
+    }
+
+
+def check_plausibility_batch(
+    firsts: Sequence[str],
+    lasts: Sequence[str],
+    claimed_countries: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """
+    check_plausibility for many names at once; preferred when scoring lists of authors.
+    Returns one result dict per input, in order, identical to the single-name call.
+    """
+    if not (len(firsts) == len(lasts) == len(claimed_countries)):
+        raise ValueError("firsts, lasts and claimed_countries must have the same length")
+    if not firsts:
+        return []
+
+    codes = [_safe_country_code(c) for c in claimed_countries]
+
+    try:
+        scored = _score_rows([_lookup_keys(f, l, c) for f, l, c in zip(firsts, lasts, codes)], codes)
+    except Exception:
+        logger.exception("check_plausibility_batch failed (n=%d)", len(codes))
+        raise
+
+    return [{"country": claimed, **result} for claimed, result in zip(claimed_countries, scored)]
@@ -56,6 +56,13 @@ class EuropeanNameNormalizer:
         # ß is already handled in _EXPAND
     }
 
+    # Compiled once: these run for every unique name at cache build and on every request
+    _SEPARATORS_RE = re.compile(r"[.,/\\]+")
+    _APOSTROPHE_SPACING_RE = re.compile(r"\s*'\s*")
+    _SYMBOLS_RE = re.compile(r"[^\w\s\u0300-\u036f]+", flags=re.UNICODE)
+    _NON_WORD_RE = re.compile(r"[^\w\s]+", flags=re.UNICODE)
+    _WHITESPACE_RE = re.compile(r"\s+")
+
     def __init__(self, *, keep_apostrophe: bool = False, de_transliteration: bool = False) -> None:
         self.keep_apostrophe = keep_apostrophe
         self.de_transliteration = de_transliteration
@@ -84,42 +91,50 @@ class EuropeanNameNormalizer:
         if not s:
             return ""
 
-        # Compatibility normalize first
-        s = unicodedata.normalize("NFKC", s)
+        if s.isascii():
+            # NFKC, the hyphen table and DE transliteration are no-ops on ASCII; only "`" remains
+            s = s.replace("`", "'")
+        else:
+            # Compatibility normalize first
+            s = unicodedata.normalize("NFKC", s)
 
-        # Normalize apostrophes/hyphens to stable forms
-        for ch in self._APOSTROPHES:
-            s = s.replace(ch, "'")
-        for ch in self._HYPHENS:
-            s = s.replace(ch, "-")
+            # Normalize apostrophes/hyphens to stable forms
+            for ch in self._APOSTROPHES:
+                s = s.replace(ch, "'")
+            for ch in self._HYPHENS:
+                s = s.replace(ch, "-")
 
-        # Optional DE transliteration BEFORE casefold (so Ä/Ö/Ü handled too)
-        if self.de_transliteration:
-            for k, v in self._DE.items():
-                s = s.replace(k, v)
+            # Optional DE transliteration BEFORE casefold (so Ä/Ö/Ü handled too)
+            if self.de_transliteration:
+                for k, v in self._DE.items():
+                    s = s.replace(k, v)
 
         # Case-insensitive matching
         s = s.casefold()
 
         # Separators/punctuation -> spaces (or keep apostrophe if configured)
         s = s.replace("-", " ")
-        s = re.sub(r"[.,/\\]+", " ", s)
+        s = self._SEPARATORS_RE.sub(" ", s)
         if self.keep_apostrophe:
-            s = re.sub(r"\s*'\s*", "'", s)
+            s = self._APOSTROPHE_SPACING_RE.sub("'", s)
         else:
             s = s.replace("'", " ")
 
         # Drop other punctuation/symbols (keep word chars, spaces, combining marks)
-        s = re.sub(r"[^\w\s\u0300-\u036f]+", " ", s, flags=re.UNICODE)
+        s = self._SYMBOLS_RE.sub(" ", s)
 
         # Collapse whitespace
-        s = re.sub(r"\s+", " ", s).strip()
+        s = self._WHITESPACE_RE.sub(" ", s).strip()
         return s
 
     def ascii_fallback(self, normalized_primary: str) -> str:
         if not normalized_primary:
             return ""
 
+        # An ASCII primary is already word chars + single spaces: nothing to expand or strip
+        if normalized_primary.isascii():
+            return normalized_primary
+
         s = normalized_primary
 
         # Apply common expansions first (primary is already casefolded)
@@ -132,6 +147,6 @@ class EuropeanNameNormalizer:
         s = unicodedata.normalize("NFC", s)
 
         # Conservative cleanup
-        s = re.sub(r"[^\w\s]+", " ", s, flags=re.UNICODE)
-        s = re.sub(r"\s+", " ", s).strip()
+        s = self._NON_WORD_RE.sub(" ", s)
+        s = self._WHITESPACE_RE.sub(" ", s).strip()
         return s
\ No newline at end of file